@@ -10,26 +10,80 @@ bumpversion config file the same way as bumpversion does.
 __author__ = "Andres FR"
 
 
+import os
+import re
+import json
 import argparse
 #
-from configparser import ConfigParser
 from packaging import version
 
 
+# the config is INI-like, but we only need a single key from a single section
+# so a full ConfigParser is overkill: scan the lines instead.
+SECTION_RE = re.compile(r"^\s*\[(.+)\]\s*$")
+VERSION_RE = re.compile(r"^\s*current_version\s*=\s*(\S+)")
+
+
+def parse_bumpversion(bumpversion_filepath):
+    """
+    Given the path to the .bumpversion.cfg file, this function scans it and
+    returns the ``[bumpversion] current_version`` field as a string.
+
+    :raises KeyError: If ``[bumpversion] current_version`` isn't in the file.
+    """
+    in_section = False
+    with open(bumpversion_filepath, 'rt', encoding='utf-8') as f:
+        for line in f:
+            m = SECTION_RE.match(line)
+            if m is not None:
+                in_section = (m.group(1) == "bumpversion")
+                continue
+            if in_section:
+                m = VERSION_RE.match(line)
+                if m is not None:
+                    return m.group(1)
+    raise KeyError("[bumpversion] current_version not found in " +
+                   bumpversion_filepath)
+
+
 def get_bumpversion(bumpversion_filepath, as_tuple=False):
     """
     Given the path to the .bumpversion.cfg file, this function
     returns its current_version field, either as string (default)
     or as tuple.
+
+    The parsed version is memoized in ``<bumpversion_filepath>.cache.json``,
+    keyed on the file's mtime and size, so repeated calls on an unchanged
+    file don't need to parse it again.
     """
-    parser = ConfigParser("")
-    # don't transform keys to lowercase (which would be the default)
-    parser.optionxform = lambda option: option
-    # parser.add_section('bumpversion')
-    with open(bumpversion_filepath, 'rt', encoding='utf-8') as f:
-        parser.read_file(f)
-        v = version.parse(parser["bumpversion"]["current_version"])
-        return v.release if as_tuple else v.public
+    cache_path = bumpversion_filepath + ".cache.json"
+    st = os.stat(bumpversion_filepath)
+    key = {"mtime": st.st_mtime_ns, "size": st.st_size}
+    v_str = None
+    try:
+        with open(cache_path, 'rt', encoding='utf-8') as f:
+            cached = json.load(f)
+        if all(cached.get(k) == v for k, v in key.items()):
+            v_str = cached["version"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass  # no usable cache: parse the file
+    if v_str is None:
+        v_str = parse_bumpversion(bumpversion_filepath)
+        # write to a temp file and then replace, so the cache is never partial.
+        # The cache is optional: if it can't be written, e.g. in a read-only
+        # directory, the version is still returned
+        tmp_path = cache_path + ".tmp"
+        try:
+            with open(tmp_path, 'wt', encoding='utf-8') as f:
+                json.dump({**key, "version": v_str}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    v = version.parse(v_str)
+    return v.release if as_tuple else v.public
 
 
 if __name__ == "__main__":
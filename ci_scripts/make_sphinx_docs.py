@@ -13,16 +13,15 @@ __author__ = "Andres FR"
 
 
 import os
+import sys
 import shutil  # to remove folder recursively
 from io_anim_mvnx.utils import ArgumentParserForBlender
-#
-import sphinx.cmd.quickstart as sphinx_quickstart
-import sphinx.ext.apidoc as sphinx_apidoc
-import sphinx.cmd.make_mode as sphinx_build
-# imports for bumpversion_utils.get_bumpversion()
-from configparser import ConfigParser
-from packaging import version
-# from bumpversion_utils import get_bumpversion
+# Blender doesn't add the script's directory to the path, so we do it here
+# in order to share get_bumpversion with bumpversion_utils
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+from bumpversion_utils import get_bumpversion  # noqa: E402
 
 
 # #############################################################################
@@ -44,26 +43,6 @@ html_theme = "sphinx_rtd_theme"
 EXTRA_END = "\nlatex_elements = {'extraclassoptions': 'openany,oneside'}"
 
 
-# #############################################################################
-# ## HELPERS
-# #############################################################################
-
-def get_bumpversion(bumpversion_filepath, as_tuple=False):
-    """
-    Given the path to the .bumpversion.cfg file, this function
-    returns its current_version field, either as string (default)
-    or as tuple.
-    """
-    parser = ConfigParser("")
-    # don't transform keys to lowercase (which would be the default)
-    parser.optionxform = lambda option: option
-    # parser.add_section('bumpversion')
-    with open(bumpversion_filepath, 'rt', encoding='utf-8') as f:
-        parser.read_file(f)
-        v = version.parse(parser["bumpversion"]["current_version"])
-        return v.release if as_tuple else v.public
-
-
 # #############################################################################
 # ## MAIN ROUTINE
 # #############################################################################
@@ -92,6 +71,10 @@ if __name__ == "__main__":
                         help="If given, it will build PDF apart from HTML.")
 
     args = parser.parse_args()
+    # sphinx is heavy to import, so we only do it once the args are OK
+    import sphinx.cmd.quickstart as sphinx_quickstart
+    import sphinx.ext.apidoc as sphinx_apidoc
+    import sphinx.cmd.make_mode as sphinx_build
     #
     PACKAGE_NAME = args.package_name
     AUTHOR = args.author_name
@@ -13,7 +13,6 @@ __author__ = "Andres FR"
 
 import os
 import sys
-import coverage
 #
 import io_anim_mvnx_utest as utest
 from io_anim_mvnx.utils import ArgumentParserForBlender
@@ -38,6 +37,14 @@ if __name__ == "__main__":
                         type=float, default=100.0,  # perfect cov. default
                         help="A float between 0.0 and 100.0 expressing the \
                         minimal code coverage required to succeed")
+    parser.add_argument("--no_branch",
+                        action="store_true",
+                        help="Measure line coverage only. Branch coverage \
+                        adds considerable tracing overhead.")
+    parser.add_argument("--no_coverage",
+                        action="store_true",
+                        help="Just run the tests, without any coverage \
+                        instrumentation (-p is then ignored).")
     args = parser.parse_args()
     #
     PACKAGE_NAME = args.package_name
@@ -45,19 +52,25 @@ if __name__ == "__main__":
     assert 0.0 <= COV_PERCENT <= 100.0,\
         "argument -p has to be between 0 and 100 and was " + str(COV_PERCENT)
 
-    # wrap the testing with the coverage analyzer:
-    c = coverage.Coverage(data_file="dummy_value", data_suffix=True,
-                          branch=True, source=[PACKAGE_NAME])
+    if args.no_coverage:
+        test_results = utest.run_all_tests()
+        cov_percentage = None
+    else:
+        import coverage
+        # wrap the testing with the coverage analyzer:
+        c = coverage.Coverage(data_file="dummy_value", data_suffix=True,
+                              branch=not args.no_branch,
+                              source=[PACKAGE_NAME])
 
-    # perform unit tests, wraped with the coverage instance
-    c.start()
-    test_results = utest.run_all_tests()
-    c.stop()
+        # perform unit tests, wraped with the coverage instance
+        c.start()
+        test_results = utest.run_all_tests()
+        c.stop()
 
-    # at this point c.save() and c.xml_report(outfile=etc) would generate
-    # persistent analysis files (html for interactive inspection).
-    # This instead handles the data within Python:
-    cov_percentage = c.report()
+        # at this point c.save() and c.xml_report(outfile=etc) would generate
+        # persistent analysis files (html for interactive inspection).
+        # This instead handles the data within Python:
+        cov_percentage = c.report()
     #
     num_tests = test_results.testsRun
     num_errors = len(test_results.errors)
@@ -71,7 +84,8 @@ if __name__ == "__main__":
     print("==================================================================")
     print("\n\n")
     #
-    if num_errors > 0 or num_failures > 0 or cov_percentage < COV_PERCENT:
+    if num_errors > 0 or num_failures > 0 or (
+            cov_percentage is not None and cov_percentage < COV_PERCENT):
         print("exiting with error!")
         sys.exit(1)
     else:
@@ -68,15 +68,19 @@ classes = [ImportMVNX, ImportFilesCollection]  # , ExportMVNX]
 # # add Panels to registered classes
 # classes += [MY_PANEL_PT_MyPanel1]
 
-register_cl, unregister_cl = bpy.utils.register_classes_factory(classes)
-kmm = KeymapManager()
-omm = OperatorToMenuManager()
+# these are created on register(), so importing the add-on stays cheap
+register_cl, unregister_cl = None, None
+kmm, omm = None, None
 
 
 def register():
     """
     Main register function, called on startup by Blender
     """
+    global register_cl, unregister_cl, kmm, omm
+    register_cl, unregister_cl = bpy.utils.register_classes_factory(classes)
+    kmm = KeymapManager()
+    omm = OperatorToMenuManager()
     # register all UI classes
     register_cl()
     # register operators into keymaps
@@ -91,10 +95,17 @@ def unregister():
     """
     Main unregister function, called on shutdown by Blender
     """
-    # unregister keymaps, menus and UI classes
-    kmm.unregister()
-    omm.unregister()
-    unregister_cl()
+    global register_cl, unregister_cl, kmm, omm
+    # unregister keymaps, menus and UI classes. They are None if register()
+    # wasn't called, or failed before creating them
+    if kmm is not None:
+        kmm.unregister()
+    if omm is not None:
+        omm.unregister()
+    if unregister_cl is not None:
+        unregister_cl()
+    register_cl, unregister_cl = None, None
+    kmm, omm = None, None
 
 
 if __name__ == "__main__":
@@ -24,6 +24,9 @@ MVN file and the way they can be accessed from Python::
   mvn_path = "XXX"
   mmvn = Mvnx(mvn_path)
 
+  # mmvn.mvnx wraps the root element (see AttrNode), children can be
+  # accessed by name. The plain lxml element is mmvn.mvnx.element
+
   # These elements contain some small metadata:
   mmvn.mvnx.attrib
   mmvn.mvnx.comment.attrib
@@ -71,11 +74,15 @@ Metadata::
 
   {'segmentCount': 23, 'sensorCount': 17, 'jointCount': 22}
 
-And this what fields would the non-normal frames have::
+And this what fields would the non-normal frames have (each config frame is
+a dict)::
 
   ['orientation', 'position', 'time', 'tc', 'ms', 'type']
 
-As for the normal frames::
+As for the normal frames, they are returned column-wise, as a dict with one
+entry per field. Float vector fields are ``(num_frames, dim)`` float32
+arrays, integer fields are ``(num_frames,)`` int64 arrays and the rest are
+lists of length ``num_frames``::
 
   ['orientation', 'position', 'velocity', 'acceleration',
    'angularVelocity', 'angularAcceleration', 'footContacts',
@@ -83,6 +90,12 @@ As for the normal frames::
    'jointAngle', 'jointAngleXZY', 'jointAngleErgo', 'centerOfMass', 'time',
    'index', 'tc', 'ms', 'type']
 
+  # e.g. the position of every segment at the 10th normal frame:
+  normal_frames["position"][9].reshape(-1, 3)
+
+The expected width of each float vector column can be obtained from the
+metadata via ``frame_vec_widths``.
+
 More information about the MVNX format can be found in section 14.4 of the
 already mentioned document:
 
@@ -93,7 +106,15 @@ already mentioned document:
 __author__ = "Andres FR"
 
 
-from lxml import etree, objectify  # https://lxml.de/validation.html
+import os
+import sys
+import hashlib
+from functools import lru_cache, partial
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+#
+import numpy as np
+from lxml import etree  # https://lxml.de/validation.html
 from .utils import make_timestamp  # , resolve_path
 
 
@@ -111,42 +132,386 @@ KNOWN_FLOAT_VEC_FIELDS = {"orientation", "position", "velocity",
                           "jointAngle", "jointAngleXZY", "jointAngleErgo",
                           "centerOfMass"}
 
+# width of the float vector fields of a frame, as (count_field, per_item):
+# e.g. orientation holds one quaternion per segment, so segmentCount * 4
+FLOAT_VEC_WIDTHS = {"orientation": ("segmentCount", 4),
+                    "position": ("segmentCount", 3),
+                    "velocity": ("segmentCount", 3),
+                    "acceleration": ("segmentCount", 3),
+                    "angularVelocity": ("segmentCount", 3),
+                    "angularAcceleration": ("segmentCount", 3),
+                    "sensorFreeAcceleration": ("sensorCount", 3),
+                    "sensorMagneticField": ("sensorCount", 3),
+                    "sensorOrientation": ("sensorCount", 4),
+                    "jointAngle": ("jointCount", 3),
+                    "jointAngleXZY": ("jointCount", 3),
+                    "centerOfMass": (None, 3)}
+
+# MVNX values have ~6 significant digits and Blender keyframes are float32
+# anyway, so float64 would only double the memory traffic. This is the default
+# for the float_dtype parameters below
+FLOAT_DTYPE = np.float32
+INT_DTYPE = np.int64
+
+# options for the plain etree.XMLParser (no ETCompatXMLParser shims needed):
+# XML comments and PIs are dropped (MVNX data, including its <comment> nodes,
+# is in regular elements). MVNX files are large, indented and don't use IDs:
+# drop whitespace nodes, skip the ID table and lift libxml2's size limits.
+# Malformed files are rejected rather than recovered.
+PARSER_KWARGS = {"remove_comments": True, "remove_pis": True,
+                 "remove_blank_text": True, "collect_ids": False,
+                 "huge_tree": True, "recover": False}
+
+# all MVNX schemata in this package have this target namespace. The XPath
+# expressions below are compiled once and return plain lists of nodes
+MVNX_NAMESPACE = "http://www.xsens.com/mvn/mvnx"
+XPATH_SEGMENTS = etree.XPath("m:subject/m:segments/m:segment",
+                             namespaces={"m": MVNX_NAMESPACE},
+                             smart_strings=False)
+XPATH_JOINTS = etree.XPath("m:subject/m:joints/m:joint",
+                           namespaces={"m": MVNX_NAMESPACE},
+                           smart_strings=False)
+XPATH_POINTS = etree.XPath("m:points/m:point",  # relative to a segment
+                           namespaces={"m": MVNX_NAMESPACE},
+                           smart_strings=False)
+XPATH_FRAMES = etree.XPath("m:subject/m:frames/m:frame",
+                           namespaces={"m": MVNX_NAMESPACE},
+                           smart_strings=False)
+SUBJECT_PATH = "{%s}subject" % MVNX_NAMESPACE
+FRAMES_PATH = "{{{0}}}subject/{{{0}}}frames".format(MVNX_NAMESPACE)
+CONNECTOR1_TAG = "{%s}connector1" % MVNX_NAMESPACE
+CONNECTOR2_TAG = "{%s}connector2" % MVNX_NAMESPACE
+POS_B_TAG = "{%s}pos_b" % MVNX_NAMESPACE
+
+# comment added to the root node by Mvnx.export
+EXPORT_MSG_TEMPLATE = "Exported from {cls} on {ts}. {extra}"
+
+# below this number of frames, worker processes cost more than they save
+PARALLEL_MIN_FRAMES = 2000
+# number of frames sent to a worker at once when parsing with iterparse
+FRAME_BATCH_SIZE = 1024
+
 
 # #############################################################################
 # ## HELPERS
 # #############################################################################
 
-def str_to_vec(x):
+def str_to_vec(x, dtype=FLOAT_DTYPE):
     """
-    Converts a node with a text like '1.23, 2.34 ...' into a list
-    like [1.23, 2.34, ...]
+    Converts a node (or string) with a text like '1.23 2.34 ...' into a
+    float32 array like [1.23, 2.34, ...]. The parsing is done by NumPy in C,
+    which is much faster than converting each number in Python. Use
+    ``.tolist()`` on the result if a list is needed.
+
+    :param dtype: NumPy float type of the result, e.g. ``np.float64``.
     """
     try:
-        return [float(y) for y in x.text.split(" ")]
+        text = x if isinstance(x, str) else x.text
+        return np.fromstring(text, sep=" ", dtype=dtype)
     except Exception as e:
         print("Could not convert to vector (skip conversion):", e)
         return x
 
 
-def process_dict(d, str_fields, int_fields, fvec_fields):
+def str_to_mat(x, cols, dtype=FLOAT_DTYPE):
+    """
+    Like ``str_to_vec``, but reshapes the result into a ``(-1, cols)``
+    matrix, e.g. ``cols=4`` turns an orientation field into one quaternion
+    per row. The reshape is a view, so it doesn't copy the data.
+    """
+    vec = str_to_vec(x, dtype)
+    if isinstance(vec, np.ndarray):
+        return vec.reshape(-1, cols)
+    return vec
+
+
+def field_converters(str_fields, int_fields, fvec_fields,
+                     float_dtype=FLOAT_DTYPE):
+    """
+    :param float_dtype: NumPy float type for the float vector fields.
+    :returns: A dict in the form ``{field_name: converter}``, so that each
+      value can be converted with a single lookup instead of checking the
+      field collections one by one. If a field is in several collections,
+      str takes precedence over int, and int over float vectors.
+    """
+    to_vec = partial(str_to_vec, dtype=float_dtype)
+    converters = {k: to_vec for k in fvec_fields}
+    converters.update((k, int) for k in int_fields)
+    converters.update((k, str) for k in str_fields)
+    return converters
+
+
+def convert_dict(d, converters):
+    """
+    :param dict converters: The output of ``field_converters``.
+    :returns: A copy of ``d`` where each value whose key has a converter has
+      been converted, with a single dict lookup per key.
+    """
+    result = {}
+    for k, v in d.items():
+        conv = converters.get(k)
+        result[k] = v if conv is None else conv(v)
+    return result
+
+
+def element_to_dict(elem, converters, keep_nodes=True):
+    """
+    :param elem: An XML node, like a ``frame``.
+    :param dict converters: The output of ``field_converters``.
+    :param bool keep_nodes: If false, children that aren't converted are
+      returned as their text instead of as XML nodes, so the dict holds no
+      reference to the tree.
+    :returns: A dict with the children of ``elem`` (by tag name without
+      namespace) and its attributes, converted like in ``process_dict``. The
+      dict is built in a single pass over the element, without intermediate
+      dicts.
+    """
+    result = {}
+    for ch in elem.iterchildren():
+        k = ch.tag.rpartition("}")[2]
+        conv = converters.get(k)
+        if conv is not None:
+            result[k] = conv(ch)
+        else:
+            result[k] = ch if keep_nodes else ch.text
+    for k, v in elem.attrib.items():
+        conv = converters.get(k)
+        result[k] = v if conv is None else conv(v)
+    return result
+
+
+def process_dict(d, str_fields, int_fields, fvec_fields, fvec_cols=None,
+                 float_dtype=FLOAT_DTYPE):
     """
+    :param fvec_cols: Optional dict in the form ``{field_name: cols}``. Float
+      vector fields listed here are returned as ``(-1, cols)`` matrices via
+      ``str_to_mat``, the rest as flat vectors.
+    :param float_dtype: NumPy float type for the float vector fields.
     :returns: a copy of the given dict where the values (expected strings)
       whose keys are in the specified fields are converted to the specified
       type. E.g. If ``int_fields`` contains the ``index`` string and the given
       dict contains the ``index`` key, the corresponding value will be
-      converted via ``int()``.
+      converted via ``int()``. If many dicts are converted with the same
+      fields, it is cheaper to build the ``field_converters`` table once and
+      call ``convert_dict``.
+    """
+    converters = field_converters(str_fields, int_fields, fvec_fields,
+                                  float_dtype)
+    if fvec_cols:
+        converters.update((k, partial(str_to_mat, cols=c, dtype=float_dtype))
+                          for k, c in fvec_cols.items() if k in fvec_fields
+                          and k not in str_fields and k not in int_fields)
+    return convert_dict(d, converters)
+
+
+def frame_vec_widths(frames_metadata):
+    """
+    :param dict frames_metadata: The converted attributes of the ``frames``
+      node, e.g. ``{'segmentCount': 23, 'sensorCount': 17, 'jointCount': 22}``
+    :returns: A dict ``{field_name: width}`` with the expected length of the
+      float vector fields in ``FLOAT_VEC_WIDTHS`` whose count is known, e.g.
+      ``92`` for ``orientation`` with 23 segments.
     """
     result = {}
-    for k, v in d.items():
-        if k in str_fields:
-            result[k] = str(v)
+    for k, (count_field, per_item) in FLOAT_VEC_WIDTHS.items():
+        if count_field is None:
+            result[k] = per_item
+        elif count_field in frames_metadata:
+            result[k] = frames_metadata[count_field] * per_item
+    return result
+
+
+def parse_vec_texts(texts, dim, dtype=FLOAT_DTYPE, field="vector"):
+    """
+    :param texts: A list of strings, each one with ``dim`` space-separated
+      numbers.
+    :param str field: Name of the parsed field, for the error message.
+    :returns: A float array of shape ``(len(texts), dim)``.
+    :raises: ``ValueError`` if the texts don't hold exactly ``dim`` numbers
+      each in total (e.g. a truncated frame).
+    """
+    arr = np.fromstring(" ".join(texts), sep=" ", dtype=dtype)
+    if arr.size != len(texts) * dim:
+        raise ValueError("Field '{}': expected {} numbers ({} entries of {}),"
+                         " got {}".format(field, len(texts) * dim, len(texts),
+                                          dim, arr.size))
+    return arr.reshape(-1, dim)
+
+
+def frames_to_columns(frames, str_fields, int_fields, fvec_fields,
+                      num_workers=1, float_dtype=FLOAT_DTYPE, skip_fields=()):
+    """
+    :param frames: A list of XML frame nodes, expected to have the same fields.
+    :param int num_workers: If greater than 1 and there are at least
+      ``PARALLEL_MIN_FRAMES`` frames, the float vectors are parsed by this
+      many worker processes, each one taking a contiguous chunk of frames.
+    :param float_dtype: NumPy float type for the float vector columns.
+    :param collection skip_fields: Fields that are left out of the result,
+      e.g. because their columns are already cached. They aren't visited in
+      the per-frame loop.
+    :returns: A dict in the form ``{field_name: column, ...}``, where each
+      column has one entry per frame. Fields in ``fvec_fields`` are stored as
+      a contiguous ``float_dtype`` array of shape ``(num_frames, dim)``,
+      fields in ``int_fields`` as an int64 array of shape ``(num_frames,)``,
+      and the rest as lists. The fields and dimensions are taken from the
+      first frame.
+    """
+    num_frames = len(frames)
+    if num_frames == 0:
+        return {}
+    # map the (namespaced) child tags to interned field names once, instead of
+    # splitting every namespaced tag again for every frame
+    field_names = {ch.tag: sys.intern(etree.QName(ch).localname)
+                   for ch in frames[0].iterchildren()}
+    field_tags = {v: k for k, v in field_names.items()}
+    converters = field_converters(str_fields, int_fields, fvec_fields,
+                                  float_dtype)
+    first = element_to_dict(frames[0], converters)
+    # the vector lengths are known from the first frame, so each field can be
+    # parsed for all frames at once and checked against the expected count.
+    # The parsed arrays become the columns as they are, so they aren't
+    # preallocated
+    vec_dims = {k: len(v) for k, v in first.items()
+                if k in fvec_fields and isinstance(v, np.ndarray)}
+    columns = {}
+    for k in first:
+        if k in skip_fields:
+            continue
+        if k in vec_dims:
+            columns[k] = None
         elif k in int_fields:
-            result[k] = int(v)
-        elif k in fvec_fields:
-            result[k] = str_to_vec(v)
+            columns[k] = np.empty(num_frames, dtype=INT_DTYPE)
         else:
-            result[k] = v
-    return result
+            columns[k] = [None] * num_frames
+    parallel = num_workers > 1 and num_frames >= PARALLEL_MIN_FRAMES
+    if parallel:
+        # only plain strings are sent to the workers, to keep pickling cheap
+        chunk = -(-num_frames // num_workers)  # ceil division
+        with ProcessPoolExecutor(num_workers) as executor:
+            for k, dim in vec_dims.items():
+                tag = field_tags[k]
+                texts = [f.find(tag).text for f in frames]
+                chunks = [texts[i:i+chunk]
+                          for i in range(0, num_frames, chunk)]
+                columns[k] = np.concatenate(list(executor.map(
+                    parse_vec_texts, chunks, repeat(dim),
+                    repeat(float_dtype), repeat(k))))
+    else:
+        # one large parse per field instead of one small parse per cell
+        for k, dim in vec_dims.items():
+            tag = field_tags[k]
+            columns[k] = parse_vec_texts([f.find(tag).text for f in frames],
+                                         dim, float_dtype, k)
+    # the remaining fields are converted straight into their columns
+    done = set(vec_dims).union(skip_fields)
+    for i, f in enumerate(frames):
+        for ch in f.iterchildren():
+            k = field_names[ch.tag]
+            if k not in done:
+                conv = converters.get(k)
+                columns[k][i] = ch if conv is None else conv(ch)
+        for k, v in f.attrib.items():
+            conv = converters.get(k)
+            columns[k][i] = v if conv is None else conv(v)
+    return columns
+
+
+@lru_cache(maxsize=8)
+def load_schema(schema_path):
+    """
+    :returns: The ``etree.XMLSchema`` compiled from the XSD at the given path.
+      Compiling a schema is expensive, so results are cached per path (i.e.
+      changes to the XSD file are only seen by a new Python session).
+    """
+    return etree.XMLSchema(file=schema_path)
+
+
+@lru_cache(maxsize=8)
+def get_parser(schema_path=None):
+    """
+    :returns: An ``etree.XMLParser`` configured with ``PARSER_KWARGS`` that
+      validates against the schema at ``schema_path`` (if given). Parsers are
+      reusable, so one is cached per schema path.
+    """
+    schema = None if schema_path is None else load_schema(schema_path)
+    return etree.XMLParser(schema=schema, **PARSER_KWARGS)
+
+
+def file_fingerprint(path, edge_bytes=4096, extra=""):
+    """
+    :param str path: Path to an existing file.
+    :param int edge_bytes: How many bytes from the beginning and end of the
+      file are hashed.
+    :param str extra: Any other information that should be part of the
+      fingerprint (e.g. parsing configuration).
+    :returns: A hex string that changes if the file's mtime, size, first or
+      last bytes change. Reading only the edges keeps this cheap for large
+      files, while catching the usual modifications.
+    """
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(("%d %d %s" % (st.st_mtime_ns, st.st_size, extra)).encode())
+    with open(path, "rb") as f:
+        h.update(f.read(edge_bytes))
+        if st.st_size > edge_bytes:
+            f.seek(max(edge_bytes, st.st_size - edge_bytes))
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class AttrNode:
+    """
+    Thin wrapper around an ``etree`` element that allows objectify-like
+    access to its children, e.g. ``node.subject.segments.iterchildren()``.
+    Children are looked up lazily with ``find`` (using the namespace of the
+    wrapped element), and everything else (``attrib``, ``text``, ``get``...)
+    is delegated to the element. Unlike objectify, this doesn't add any
+    per-element overhead to the parsed tree. The wrapped element is
+    available as ``node.element``.
+    """
+
+    __slots__ = ("element",)
+
+    def __init__(self, element):
+        """
+        :param element: An ``etree._Element``.
+        """
+        self.element = element
+
+    def __getattr__(self, name):
+        """
+        Element attributes and methods take precedence over child nodes.
+        """
+        if name.startswith("__") or hasattr(etree._Element, name):
+            return getattr(self.element, name)
+        ns = etree.QName(self.element).namespace
+        child = self.element.find(name if ns is None else
+                                  "{%s}%s" % (ns, name))
+        if child is None:
+            raise AttributeError("no such child: " + name)
+        return AttrNode(child)
+
+    def iterchildren(self, *args, **kwargs):
+        """
+        Like ``_Element.iterchildren``, but yielding ``AttrNode`` instances.
+        """
+        return (AttrNode(ch)
+                for ch in self.element.iterchildren(*args, **kwargs))
+
+    def getchildren(self):
+        """
+        :returns: A list with the children as ``AttrNode`` instances.
+        """
+        return list(self.iterchildren())
+
+    def __iter__(self):
+        return self.iterchildren()
+
+    def __len__(self):
+        return len(self.element)
+
+    def __repr__(self):
+        return "AttrNode(%r)" % self.element
 
 
 # #############################################################################
@@ -159,73 +524,334 @@ class Mvnx:
     to a Python-friendly representation. See this module's docstring for usage
     examples and more information.
     """
+
+    CACHE_SUFFIX = ".cache.npz"  # see extract_frame_info
+
     def __init__(self, mvnx_path, mvnx_schema_path=None,
                  str_fields=KNOWN_STR_FIELDS, int_fields=KNOWN_INT_FIELDS,
-                 float_vec_fields=KNOWN_FLOAT_VEC_FIELDS):
+                 float_vec_fields=KNOWN_FLOAT_VEC_FIELDS, num_workers=1,
+                 keep_frames=True, float_dtype=FLOAT_DTYPE,
+                 needed_fields=None):
         """
         :param str mvnx_path: a valid path pointing to the XML file to load
         :param str mvnx_schema_path: (optional): if given, the given MVNX will
           be validated against this XML schema definition.
         :param collection fields: List of strings with field names that are
           converted to the specified type when calling ``extract_frame_info``.
+        :param int num_workers: Number of processes used to parse the frames
+          in ``extract_frame_info`` (see ``frames_to_columns``), or while
+          parsing if ``keep_frames`` is false (see ``parse_without_frames``).
+          Worker processes are started via ``multiprocessing``, so the
+          default is to parse everything in the calling process.
+        :param bool keep_frames: If false, the file is parsed in a single
+          ``iterparse`` pass where the frames are converted into columns
+          and then removed from the tree (see ``parse_without_frames``).
+          This reduces the peak memory, but ``self.mvnx`` won't contain any
+          ``frame`` nodes (so they won't be exported either).
+          ``extract_frame_info`` works in both cases.
+        :param float_dtype: NumPy float type for the float vector fields.
+          The default float32 is enough for MVNX data, pass ``np.float64``
+          to keep more precision.
+        :param collection needed_fields: If given, only the float vector
+          fields in this collection are parsed. The others are left as XML
+          nodes, like unknown fields (or as their text if ``keep_frames`` is
+          false). E.g. importing into Blender only needs
+          ``{"orientation", "position"}``, which skips most of the parsing.
         """
         self.mvnx_path = mvnx_path
-        #
-        mvnx = etree.parse(mvnx_path, etree.ETCompatXMLParser())
-        # if a schema is given, load it and validate mvn
+        if needed_fields is not None:
+            float_vec_fields = set(float_vec_fields).intersection(
+                needed_fields)
+        # if a schema is given, load it and validate mvn while parsing
+        schema = None
         if mvnx_schema_path is not None:
-            self.schema = etree.XMLSchema(file=mvnx_schema_path)
-            self.schema.assertValid(mvnx)
-        #
-        self.mvnx = objectify.fromstring(etree.tostring(mvnx))
+            self.schema = schema = load_schema(mvnx_schema_path)
+        # plain etree: only the root is wrapped for objectify-like access.
+        # Parsing is always done by path, so libxml2 reads the file itself
+        # in C: no Python file object, read() or mmap buffer in between
+        try:
+            if keep_frames:
+                root = etree.parse(mvnx_path,
+                                   get_parser(mvnx_schema_path)).getroot()
+                self._frames_raw = None
+            else:
+                root, config_f, normal_f = self.parse_without_frames(
+                    mvnx_path, schema, str_fields, int_fields,
+                    float_vec_fields, num_workers, float_dtype)
+                self._frames_raw = (config_f, normal_f)
+        except etree.XMLSyntaxError as e:
+            # schema violations are reported as syntax errors by the parser:
+            # raise them as DocumentInvalid, like XMLSchema.assertValid does
+            if any(err.domain_name == "SCHEMASV" for err in e.error_log):
+                raise etree.DocumentInvalid(str(e)) from e
+            raise
+        self.mvnx = AttrNode(root)
         #
         self.str_fields = str_fields
         self.int_fields = int_fields
         self.fvec_fields = float_vec_fields
+        self.num_workers = num_workers
+        self.float_dtype = float_dtype
+        # the field sets are fixed per instance, and so is their dispatch
+        self.converters = field_converters(str_fields, int_fields,
+                                           float_vec_fields, float_dtype)
+        # filled by the extract_segments/points/joints methods on first call
+        self._segments = None
+        self._segment_points = None
+        self._joints = None
+        # filled by frames_ndarray on its first call
+        self._normal_frames = None
 
-    def export(self, filepath, pretty_print=True, extra_comment=""):
+    @staticmethod
+    def parse_without_frames(mvnx_path, schema, str_fields, int_fields,
+                             fvec_fields, num_workers=1,
+                             float_dtype=FLOAT_DTYPE):
+        """
+        Parses the MVNX in a single ``iterparse`` pass. The config frames
+        are converted via ``element_to_dict``, and the normal frames go
+        straight into columns: the texts of their float vector fields are
+        collected per field and parsed at once via ``parse_vec_texts``, like
+        in ``frames_to_columns``, and the rest is converted as it comes.
+        Every frame is then cleared and removed from the tree, and children
+        that aren't converted are kept as their text, so the XML of at most
+        one frame is held in memory.
+
+        :param schema: An ``etree.XMLSchema`` to validate against, or None.
+        :param int num_workers: If greater than 1, once there are at least
+          ``PARALLEL_MIN_FRAMES`` normal frames, the collected texts are sent
+          every ``FRAME_BATCH_SIZE`` frames to this many worker processes,
+          while the parsing goes on. The batches are collected in order.
+        :param float_dtype: NumPy float type for the float vector fields.
+        :returns: A tuple ``(root, config_frames, normal_frames)``, where
+          root is the MVNX root element without ``frame`` nodes, and the
+          frames are like the ones given by ``extract_frames``.
+        """
+        context = etree.iterparse(mvnx_path, events=("end",), tag="{*}frame",
+                                  schema=schema, **PARSER_KWARGS)
+        converters = field_converters(str_fields, int_fields, fvec_fields,
+                                      float_dtype)
+        config_frames, columns = [], {}
+        # {field_name: list}: the float vector texts waiting to be parsed,
+        # and the futures of the batches already sent to the workers
+        vec_texts, vec_dims, vec_futures = {}, {}, {}
+        # {tag or attribute name: (list.append, converter)}, set up when the
+        # field is first seen, so each value only costs one lookup
+        child_targets, attr_targets = {}, {}
+        num_normal, executor = 0, None
+        try:
+            for _, elem in context:
+                if len(config_frames) < 3:
+                    config_frames.append(element_to_dict(elem, converters,
+                                                         keep_nodes=False))
+                    elem.clear()
+                    elem.getparent().remove(elem)
+                    continue
+                for ch in elem.iterchildren():
+                    target = child_targets.get(ch.tag)
+                    if target is None:
+                        k = sys.intern(ch.tag.rpartition("}")[2])
+                        if k in fvec_fields:
+                            # the vector lengths are taken from the first
+                            # frame, like in frames_to_columns
+                            vec_dims[k] = len(ch.text.split())
+                            vec_futures[k] = []
+                            columns[k] = None  # keeps the field order
+                            target = (vec_texts.setdefault(k, []).append,
+                                      None)
+                        else:
+                            target = (columns.setdefault(k, []).append,
+                                      converters.get(k))
+                        child_targets[ch.tag] = target
+                    append, conv = target
+                    append(ch.text if conv is None else conv(ch.text))
+                for k, v in elem.attrib.items():
+                    target = attr_targets.get(k)
+                    if target is None:
+                        target = attr_targets[k] = (
+                            columns.setdefault(sys.intern(k), []).append,
+                            converters.get(k))
+                    append, conv = target
+                    append(v if conv is None else conv(v))
+                elem.clear()
+                elem.getparent().remove(elem)
+                num_normal += 1
+                if num_workers > 1 and num_normal >= PARALLEL_MIN_FRAMES \
+                   and num_normal % FRAME_BATCH_SIZE == 0:
+                    if executor is None:
+                        executor = ProcessPoolExecutor(num_workers)
+                    # the workers get a copy, since the lists are reused
+                    for k, texts in vec_texts.items():
+                        vec_futures[k].append(executor.submit(
+                            parse_vec_texts, texts[:], vec_dims[k],
+                            float_dtype, k))
+                        texts.clear()
+            # one large parse per field for the remaining texts, each one
+            # dropped once parsed
+            for k in list(vec_texts):
+                parts = [fut.result() for fut in vec_futures[k]]
+                parts.append(parse_vec_texts(vec_texts.pop(k), vec_dims[k],
+                                             float_dtype, k))
+                columns[k] = parts[0] if len(parts) == 1 else \
+                    np.concatenate(parts)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        for k, col in columns.items():
+            if k not in vec_dims and k in int_fields:
+                columns[k] = np.array(col, dtype=INT_DTYPE)
+        return context.root, config_frames, columns
+
+    def export(self, filepath, pretty_print=True, extra_comment="",
+               timestamp=None):
         """
         Saves the current ``mvnx`` attribute to the given file path as XML and
         adds the ``self.mvnx.attrib["pythonComment"]`` attribute with
-        a timestamp.
+        a timestamp. The XML is written incrementally, so no copy of the
+        serialized file is held in memory.
+
+        :param str timestamp: If given, it is used instead of calling
+          ``make_timestamp``, e.g. to share a single timestamp across a batch
+          of exports.
         """
-        #
-        with open(filepath, "w") as f:
-            msg = "Exported from %s on %s. " % (
-                self.__class__.__name__, make_timestamp()) + extra_comment
-            self.mvnx.attrib["pythonComment"] = msg
-            s = etree.tostring(self.mvnx,
-                               pretty_print=pretty_print).decode("utf-8")
-            f.write(s)
-            print("[Mvnx] exported to", filepath)
+        if timestamp is None:
+            timestamp = make_timestamp()
+        msg = EXPORT_MSG_TEMPLATE.format(cls=self.__class__.__name__,
+                                         ts=timestamp, extra=extra_comment)
+        self.mvnx.attrib["pythonComment"] = msg
+        # libxml2 serializes straight into the file, instead of building the
+        # whole document as bytes and then as str in Python. The output is
+        # the same as the one from etree.tostring
+        etree.ElementTree(self.mvnx.element).write(filepath,
+                                                   pretty_print=pretty_print)
+        print("[Mvnx] exported to", filepath)
 
     # EXTRACTORS: LIKE "GETTERS" BUT RETURN A MODIFIED COPY OF THE CONTENTS
-    def extract_frame_info(self):
+    def extract_frame_info(self, use_cache=False):
         """
+        :param bool use_cache: If true, the float vector columns of the normal
+          frames are read from ``<mvnx_path><CACHE_SUFFIX>`` if it exists and
+          its fingerprint matches the MVNX file (see ``file_fingerprint``).
+          Otherwise they are parsed and the cache is (re)written. Ignored if
+          the frames were already converted at construction (see
+          ``keep_frames``). In that case, the returned columns are the ones
+          converted at construction, shared between calls.
         :returns: The tuple ``(frames_metadata, config_frames, normal_frames)``
         """
-        f_meta, config_f, normal_f = self.extract_frames(self.mvnx,
-                                                         self.str_fields,
-                                                         self.int_fields,
-                                                         self.fvec_fields)
+        if self._frames_raw is not None:
+            f_meta = convert_dict(self.mvnx.element.find(FRAMES_PATH).attrib,
+                                  self.converters)
+            config_f = [dict(f) for f in self._frames_raw[0]]
+            normal_f = dict(self._frames_raw[1])
+        elif use_cache:
+            f_meta, config_f, normal_f = self._extract_frames_cached()
+        else:
+            f_meta, config_f, normal_f = self.extract_frames(
+                self.mvnx.element, self.str_fields, self.int_fields,
+                self.fvec_fields, num_workers=self.num_workers,
+                float_dtype=self.float_dtype)
         frames_metadata = f_meta
         config_frames = config_f
         normal_frames = normal_f
         #
-        assert (frames_metadata["segmentCount"] ==
-                len(self.extract_segments())), "Inconsistent segmentCount?"
+        if __debug__:  # skip the extra walk over the segments under -O
+            seg_count = len(self.extract_segments())
+            assert frames_metadata["segmentCount"] == seg_count, \
+                "Inconsistent segmentCount?"
+            for k, w in frame_vec_widths(frames_metadata).items():
+                col = normal_frames.get(k)
+                assert not isinstance(col, np.ndarray) or \
+                    col.shape[1:] == (w,), "Unexpected width for " + k
         return frames_metadata, config_frames, normal_frames
 
+    def frames_ndarray(self, field):
+        """
+        :param str field: Name of a numeric field of the normal frames, e.g.
+          ``"orientation"``.
+        :returns: The C-contiguous ``(num_frames, dim)`` array of the field
+          (or ``(num_frames,)`` for integer fields), as produced by the
+          parser, without copying. ``arr.ravel()`` is then also a view, which
+          can be passed as-is to bulk setters like Blender's ``foreach_set``.
+          The frames are extracted on the first call and kept in the
+          instance, so the returned arrays shouldn't be modified in place.
+        """
+        if self._normal_frames is None:
+            self._normal_frames = self.extract_frame_info()[2]
+        arr = self._normal_frames[field]
+        assert isinstance(arr, np.ndarray), \
+            "Not a numeric field (not in the converted fields?): " + field
+        return arr
+
+    def times_ndarray(self):
+        """
+        :returns: The ``(num_frames,)`` integer array with the ``time`` of
+          each normal frame (in milliseconds). See ``frames_ndarray``.
+        """
+        return self.frames_ndarray("time")
+
+    def _extract_frames_cached(self):
+        """
+        Like ``extract_frames``, but reading/writing the float vector columns
+        of the normal frames from/to the ``.npz`` cache next to the MVNX.
+
+        A cache hit only spares the float vector fields: the MVNX is still
+        parsed into an XML tree when the instance is created, the config
+        frames are converted as usual, and the remaining fields of every
+        normal frame (e.g. ``time`` or ``index``) are still read from the
+        tree, one frame at a time.
+        """
+        cache_path = self.mvnx_path + self.CACHE_SUFFIX
+        fingerprint = file_fingerprint(
+            self.mvnx_path, extra=" ".join(
+                [np.dtype(self.float_dtype).name] + sorted(self.fvec_fields)))
+        cached = {}
+        try:
+            with np.load(cache_path, allow_pickle=False) as npz:
+                if str(npz["fingerprint"]) == fingerprint:
+                    cached = {k: npz[k] for k in npz.files
+                              if k != "fingerprint"}
+        except (OSError, KeyError, ValueError):
+            pass  # no usable cache: parse and write it
+        result = self.extract_frames(self.mvnx.element, self.str_fields,
+                                     self.int_fields, self.fvec_fields,
+                                     cached_columns=cached,
+                                     num_workers=self.num_workers,
+                                     float_dtype=self.float_dtype)
+        if not cached:
+            arrays = {k: v for k, v in result[2].items()
+                      if k in self.fvec_fields and isinstance(v, np.ndarray)}
+            # write to a temp file and then replace, so it is never partial.
+            # The cache is optional: if it can't be written, e.g. next to a
+            # read-only MVNX, the parsed result is still returned
+            tmp_path = cache_path + ".tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    np.savez(f, fingerprint=np.array(fingerprint), **arrays)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+        return result
+
     @staticmethod
-    def extract_frames(mvnx, str_fields, int_fields, fvec_fields):
+    def extract_frames(mvnx, str_fields, int_fields, fvec_fields,
+                       cached_columns=None, num_workers=1,
+                       float_dtype=FLOAT_DTYPE, needed_fields=None):
         """
         The bulk of the MVNX file is the ``mvnx->subject->frames`` section.
         This function parses it and returns its information in a
         python-friendly format, mainly via the ``process_dict`` function.
 
-        :param mvnx: An XML tree, expected to be in MVNX format
+        :param mvnx: An XML root element (or its ``AttrNode``), expected to
+          be in MVNX format
         :param collection fields: Collection of strings with field names that
           are converted to the specified type (fvec is a vector of floats).
+        :param dict cached_columns: Optional ``{field_name: column}`` with
+          already parsed normal frame columns. These fields won't be parsed.
+        :param int num_workers: See ``frames_to_columns``.
+        :param float_dtype: NumPy float type for the float vector fields.
+        :param needed_fields: See ``Mvnx.__init__``.
 
         :returns: a tuple ``(frames_metadata, config_frames, normal_frames)``
           where the metadata is a dict in the form ``{'segmentCount': 23,
@@ -233,32 +859,109 @@ class Mvnx:
           first 3 frame entries (expected to contain special config info)
           and the normal_frames are all frames starting from the 4th.
           Fields found in the given int and vec field lists will be converted
-          and the rest will remain as XML nodes.
+          and the rest will remain as XML nodes. Config frames are returned as
+          a list of dicts, whereas normal frames are returned as a dict of
+          columns (see ``frames_to_columns``).
         """
-        frames_metadata = process_dict(mvnx.subject.frames.attrib,
+        if isinstance(mvnx, AttrNode):
+            mvnx = mvnx.element
+        if needed_fields is not None:
+            fvec_fields = set(fvec_fields).intersection(needed_fields)
+        frames_metadata = process_dict(mvnx.find(FRAMES_PATH).attrib,
                                        str_fields, int_fields, fvec_fields)
         # first 3 frames are config. types: "identity", "tpose", "tpose-isb"
-        all_frames = mvnx.subject.frames.getchildren()
+        all_frames = XPATH_FRAMES(mvnx)
         # rest of frames contain proper data. type: "normal"
-        config_frames = [process_dict({**f.__dict__, **f.attrib},
-                                      str_fields, int_fields, fvec_fields)
+        converters = field_converters(str_fields, int_fields, fvec_fields,
+                                      float_dtype)
+        config_frames = [element_to_dict(f, converters)
                          for f in all_frames[:3]]
-        normal_frames = [process_dict({**f.__dict__, **f.attrib},
-                                      str_fields, int_fields, fvec_fields)
-                         for f in all_frames[3:]]
+        if not cached_columns:
+            normal_frames = frames_to_columns(all_frames[3:], str_fields,
+                                              int_fields, fvec_fields,
+                                              num_workers, float_dtype)
+        else:
+            # the cached fields are skipped altogether, not only their parsing
+            normal_frames = frames_to_columns(
+                all_frames[3:], str_fields, int_fields,
+                set(fvec_fields).difference(cached_columns), num_workers,
+                float_dtype, skip_fields=set(cached_columns))
+            normal_frames.update(cached_columns)
         return frames_metadata, config_frames, normal_frames
 
+    @staticmethod
+    def extract_frames_streaming(mvnx_path, str_fields=KNOWN_STR_FIELDS,
+                                 int_fields=KNOWN_INT_FIELDS,
+                                 fvec_fields=KNOWN_FLOAT_VEC_FIELDS,
+                                 float_dtype=FLOAT_DTYPE):
+        """
+        Generator alternative to ``extract_frames`` that doesn't require the
+        full tree in memory: it parses the file at ``mvnx_path`` incrementally
+        and yields one ``process_dict`` result per frame, in file order (config
+        frames included, they can be told apart by their ``type`` field).
+
+        After being processed, each frame is cleared and removed from the tree
+        together with its preceding siblings, so memory usage is bounded by a
+        single frame rather than by the length of the sequence.
+        """
+        converters = field_converters(str_fields, int_fields, fvec_fields,
+                                      float_dtype)
+        for _, elem in etree.iterparse(mvnx_path, events=("end",),
+                                       tag="{*}frame", **PARSER_KWARGS):
+            yield element_to_dict(elem, converters)
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
     def extract_segments(self):
         """
         :returns: A list of the segment names in ``self.mvnx.subject.segments``
-          ordered by id (starting at 1 and incrementing +1).
+          ordered by id (starting at 1 and incrementing +1). The tree is only
+          walked on the first call, later calls return a copy of that result
+          (so changes to ``self.mvnx`` after that aren't reflected).
+        """
+        if self._segments is None:
+            segments = XPATH_SEGMENTS(self.mvnx.element)
+            ids = [int(s.get("id")) for s in segments]
+            assert ids == list(range(1, len(ids) + 1)), \
+                "Segments aren't ordered by id?"
+            self._segments = [s.get("label") for s in segments]
+        return list(self._segments)
+
+    def extract_segment_points(self, point_labels=None):
         """
-        segments = [ch.attrib["label"] if str(i) == ch.attrib["id"] else None
-                    for i, ch in enumerate(
-                            self.mvnx.subject.segments.iterchildren(), 1)]
-        assert all([s is not None for s in segments]),\
-            "Segments aren't ordered by id?"
-        return segments
+        :param point_labels: If given, a set of point names. Only the points
+          with those names are returned (and their ``pos_b`` parsed).
+        :returns: A dict in the form ``{seg_name: {point_name: pos_b}, ...}``
+          with one entry per segment, where ``pos_b`` is the 3D offset of the
+          point, as a float64 array of shape ``(3,)``. Like in
+          ``extract_segments``, if all points are requested the tree is only
+          walked on the first call.
+        """
+        points = self._segment_points
+        if points is None:
+            labels, texts = [], []
+            for s in XPATH_SEGMENTS(self.mvnx.element):
+                s_label = s.get("label")
+                labels.append((s_label, None))
+                for p in XPATH_POINTS(s):
+                    p_label = p.get("label")
+                    if point_labels is None or p_label in point_labels:
+                        labels.append((s_label, p_label))
+                        texts.append(p.findtext(POS_B_TAG))
+            # all offsets are parsed at once, one row per point
+            offsets = iter(parse_vec_texts(texts, 3, np.float64, "pos_b"))
+            points = {}
+            for s_label, p_label in labels:
+                if p_label is None:
+                    points[s_label] = {}
+                else:
+                    points[s_label][p_label] = next(offsets)
+            if point_labels is None:
+                self._segment_points = points
+        return {k: {p: offs.copy() for p, offs in v.items()
+                    if point_labels is None or p in point_labels}
+                for k, v in points.items()}
 
     def extract_joints(self):
         """
@@ -267,13 +970,19 @@ class Mvnx:
           The element Y is a list in the original MVNX ordering, in the form
           [((seg_ori, point_ori), (seg_dest, point_dest)), ...], where each
           element contains 4 strings summarizing the origin->destiny of a
-          connection.
-        """
-        names, connectors = [], []
-        for j in self.mvnx.subject.joints.iterchildren():
-            names.append(j.attrib["label"])
-            #
-            seg_ori, point_ori = j.connector1.text.split("/")
-            seg_dest, point_dest = j.connector2.text.split("/")
-            connectors.append(((seg_ori, point_ori), (seg_dest, point_dest)))
-        return names, connectors
+          connection. Like in ``extract_segments``, the tree is only walked on
+          the first call.
+        """
+        if self._joints is None:
+            names, connectors = [], []
+            for j in XPATH_JOINTS(self.mvnx.element):
+                names.append(j.get("label"))
+                # the schema defines connector1 followed by connector2
+                c1, c2 = j.iterchildren(CONNECTOR1_TAG, CONNECTOR2_TAG)
+                seg_ori, _, point_ori = c1.text.partition("/")
+                seg_dest, _, point_dest = c2.text.partition("/")
+                connectors.append(((seg_ori, point_ori),
+                                   (seg_dest, point_dest)))
+            self._joints = (names, connectors)
+        names, connectors = self._joints
+        return list(names), list(connectors)
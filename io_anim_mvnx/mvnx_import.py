@@ -24,99 +24,142 @@ __author__ = "Andres FR"  # inspired in the official Blender BVH importer
 
 from os.path import basename
 #
+import numpy as np
 import bpy
-from mathutils import Vector, Quaternion, Matrix
 #
-from .mvnx import Mvnx
-from .utils import str_to_vec
+from .mvnx import Mvnx, SUBJECT_PATH
+from .utils import quat_conjugate, quat_mul
+
+
+# #############################################################################
+# ## GLOBALS
+# #############################################################################
+
+# default MVNX point labels for the head of root bones and the tail of leaves
+ROOT_POINTS = frozenset({"pHipOrigin"})
+LEAF_POINTS = frozenset({"pTopOfHead", "pRightTopOfHand", "pLeftTopOfHand",
+                         "pRightToe", "pLeftToe"})
+# a bone is connected if its head is closer than this to its parent's tail
+CONNECT_DISTANCE = 1e-5
 
 
 # #############################################################################
 # ## HELPERS
 # #############################################################################
 
-def set_bone_head_and_tail(bone, segment_points, joints,
-                           root_points=["pHipOrigin"],
-                           leaf_points=["pTopOfHead",
-                                        "pRightTopOfHand", "pLeftTopOfHand",
-                                        "pRightToe", "pLeftToe"],
-                           scale=1.0):
+def compute_heads_and_tails(seg_names, segment_points, joints,
+                            root_points=ROOT_POINTS, leaf_points=LEAF_POINTS,
+                            scale=1.0):
     """
-    :param bone: an EditBone
+    :param list seg_names: The segment names, in MVNX (id) order.
     :param segment_points: A dict of dicts that allows to find an offset given
       a joint connector. Expected: {seg_name: {p_name: 3d_vector, ...}, ...}.
     :param joints: A list in the original MVNX ordering, in the form
       [((seg_ori, point_ori), (seg_dest, point_dest)), ...], where each element
       contains 4 strings summarizing the origin->destiny of a connection.
-    :param list root_points: If a given bone/segment is root (has no parent),
-      the first match in this list will be taken as bone.head.
-    :param list leaf_points: If a given bone/segment is a leaf (has no
-      children), the first match in this list will be taken as bone.tail.
+    :param frozenset root_points: If a given bone/segment is root (has no
+      parent), its first point with a label in this set will be taken as
+      bone.head.
+    :param frozenset leaf_points: If a given bone/segment is a leaf (has no
+      children), its first point with a label in this set will be taken as
+      bone.tail.
     :param float scale: A positive float by which head and tail vectors will
       be multiplied.
-
-    For a given bone, this function reads the information of its parent and,
-    given some MVNX data and assumptions, calculates its head and tail
-    positions. It is also responsible of rescaling the armature.
+    :returns: A tuple ``(parent_idxs, heads, tails, connected)``.
+      ``parent_idxs`` is an int array with the parent index of each segment
+      (-1 for roots),
+      ``heads`` and ``tails`` are float arrays of shape ``(num_segments, 3)``
+      and ``connected`` is a boolean array, true for the bones whose head
+      coincides with their parent's tail (up to ``CONNECT_DISTANCE``).
+
+    Given the MVNX data and some assumptions, this function calculates the
+    head and tail positions of all bones (without touching Blender), so they
+    can be assigned to the edit bones in a single pass. It is also
+    responsible of rescaling the armature. The bone tree is given by the
+    joints, and flattened into parent indices plus a breadth-first order,
+    which is then processed in a single forward pass (so the parents are
+    always computed before their children).
 
     .. warning::
       This function assumes the following:
-        1. If the bone has a parent, it can be found under bone.parent.
-        2. The head and tail of the parent have been already properly set.
-        3. If this bone is a root, its segment will have a point with
-           a label in root_points.
-        4. If this bone is a leaf, its segment will have a point with
-           a label in leaf_points.
-        5. For a given bone, there aren't any possible collisions between the
-           different root or head_points, i.e., the first match in the list
-           will always be a good match (this happens e.g. if each leaf has
-           a uniquely named leaf_point, which is usually the case).
+        1. If a segment is root, it will have a point with a label in
+           root_points.
+        2. If a segment is a leaf, it will have a point with a label in
+           leaf_points.
+        3. For a given bone, there aren't any possible collisions between the
+           different root or head_points, i.e., the first match in the
+           segment will always be a good match (this happens e.g. if each
+           leaf has a uniquely named leaf_point, which is usually the case).
     """
-    b_name = bone.name
-    # find head:
-    if bone.parent is None:
-        # if root, we assume a point in root_points exists
-        bone.head = next(v for k, v in segment_points[b_name].items()
-                         if k in root_points).copy()
-        if scale != 1.0:
-            bone.head *= scale
-    else:
-        bp_name = bone.parent.name
-        # get first joint that contains both this bone and parent
-        j = next(((c1, p1), (c2, p2)) for ((c1, p1), (c2, p2)) in joints
-                 if c1 == bp_name and c2 == b_name)
-        # head_offs = offset from parent to this plus extra offset (usually 0)
-        head_offs = segment_points[bp_name][j[0][1]].copy()  # parent's offs
-        head_offs += segment_points[b_name][j[1][1]]  # extra offset
-        if scale != 1.0:
-            head_offs *= scale
-        bone.head = bone.parent.head.copy() + head_offs
-        if bone.head == bone.parent.tail:
-            bone.use_connect = True  # avoid connecting separated bones
-    # find tail:
-    if not bone.children:
-        # if leaf, we assume a point in leaf_points exists
-        tail_offs = next(v for k, v in segment_points[b_name].items()
-                         if k in leaf_points).copy()
-    else:
-        # get first joint that contains this bone as parent
-        j = next(p1 for ((c1, p1), _) in joints if c1 == b_name)
-        tail_offs = segment_points[b_name][j].copy()
-    if scale != 1.0:
-        tail_offs *= scale
-    bone.tail = bone.head.copy() + tail_offs
+    seg2idx = {s: i for i, s in enumerate(seg_names)}
+    num_segments = len(seg_names)
+    # flatten the tree in a single pass over the joints. For each parent
+    # and child, the first joint that connects them gives the head offset,
+    # and the first joint that has the bone as parent gives its tail
+    parent_idxs = np.full(num_segments, -1)
+    head_points = {}
+    tail_points = {}
+    for (c1, p1), (c2, p2) in joints:
+        i1, i2 = seg2idx[c1], seg2idx[c2]
+        parent_idxs[i2] = i1
+        head_points.setdefault((i1, i2), (p1, p2))
+        tail_points.setdefault(i1, p1)
+    children = [[] for _ in seg_names]
+    for i, p in enumerate(parent_idxs):
+        if p >= 0:
+            children[p].append(i)
+    # breadth-first order: the list grows while it is being traversed
+    order = [i for i, p in enumerate(parent_idxs) if p < 0]
+    for i in order:
+        order.extend(children[i])
+    assert len(order) == num_segments, "Joints don't form a forest?"
+    #
+    heads = np.zeros((num_segments, 3))
+    tails = np.zeros((num_segments, 3))
+    connected = np.zeros(num_segments, dtype=bool)
+    for i in order:
+        b_name, p = seg_names[i], parent_idxs[i]
+        # find head:
+        if p < 0:
+            # if root, we assume a point in root_points exists
+            heads[i] = next(v for k, v in segment_points[b_name].items()
+                            if k in root_points) * scale
+        else:
+            p1, p2 = head_points[(p, i)]
+            # head_offs = offset from parent to this plus extra offset
+            # (usually 0, and then skipped)
+            head_offs = segment_points[seg_names[p]][p1]
+            extra_offs = segment_points[b_name][p2]
+            if extra_offs.any():
+                head_offs = head_offs + extra_offs
+            heads[i] = heads[p] + head_offs * scale
+            # avoid connecting separated bones. A tolerance is used, since
+            # the scaled offset sums may differ by rounding errors
+            diff = heads[i] - tails[p]
+            connected[i] = diff.dot(diff) < CONNECT_DISTANCE ** 2
+        # find tail:
+        if i not in tail_points:
+            # if leaf, we assume a point in leaf_points exists
+            tail_offs = next(v for k, v in segment_points[b_name].items()
+                             if k in leaf_points)
+        else:
+            tail_offs = segment_points[b_name][tail_points[i]]
+        tails[i] = heads[i] + tail_offs * scale
+    return parent_idxs, heads, tails, connected
 
 
 def global_to_inherited_quats(quaternions, joints, name_to_idx_map):
     """
-    :param list quaternions: [q1, q2, ...]
+    :param quaternions: Array of shape ``(..., num_segments, 4)``, where
+      the last axis holds ``wxyz`` quaternions (e.g. one row per frame).
     :param joints: A list of segment connections in the form
       [(parent_name, child_name), ...]
     :param dict name_to_idx_map: A dict in the form {seg_name: idx, ...} where
-      The quaternion for the segment seg_name can be found in quaternions[idx].
+      The quaternion for the segment seg_name can be found in
+      ``quaternions[..., idx, :]``.
 
-    Given the list of MVNX quaternions and their tree relations,
-    return a list with same shape, but each quaternion is expressed relative
+    Given the MVNX quaternions and their tree relations,
+    return an array with same shape, but each quaternion is expressed relative
     to its parent. For that, it suffices the following calculation::
 
       q_child_relative = q_parent_glob.conjugated() * q_child_glob
@@ -125,10 +168,13 @@ def global_to_inherited_quats(quaternions, joints, name_to_idx_map):
       This function assumes that all the input quaternion orientations are
       given with respect to the same global reference.
     """
-    result = [q.copy() for q in quaternions]
-    for c_ori, c_dest in joints:
-        q_ori_inv = quaternions[name_to_idx_map[c_ori]].conjugated()
-        result[name_to_idx_map[c_dest]].rotate(q_ori_inv)
+    ori_idxs = [name_to_idx_map[c_ori] for c_ori, _ in joints]
+    dest_idxs = [name_to_idx_map[c_dest] for _, c_dest in joints]
+    # all joints at once: gather parents and children, and scatter back
+    result = quaternions.copy()
+    result[..., dest_idxs, :] = quat_mul(
+        quat_conjugate(quaternions[..., ori_idxs, :]),
+        quaternions[..., dest_idxs, :])
     return result
 
 
@@ -172,8 +218,9 @@ def load_mvnx_into_blender(
     :param bool verbose: If true, prints some information about the process
       to the terminal.
     :returns: A tuple ``(arm_ob, mvnx)``, where mvnx is a pointer to the
-      Mvnx instance (basically an objectified XML file with extra
-      functionality), and arm_ob is a pointer to the created Blender Armature
+      Mvnx instance (basically an XML tree with extra functionality, loaded
+      with ``keep_frames=False``), and arm_ob is a pointer to the created
+      Blender Armature
       (whose name will be the same as the MVNX file, plus potentially extra
       '.XYZ' digits if a file is imported multiple times).
 
@@ -188,60 +235,81 @@ def load_mvnx_into_blender(
     if verbose:
         print("Loading MVNX and extracting basic data...")
     mvnx_filename = basename(filepath)
-    mvnx = Mvnx(filepath, mvnx_schema_path)
+    # frames are converted while parsing and dropped from the XML tree. Only
+    # orientations and positions are imported, so the rest isn't parsed
+    mvnx = Mvnx(filepath, mvnx_schema_path, keep_frames=False,
+                needed_fields={"orientation", "position"})
     #
     frames_metadata, config_frames, normal_frames = mvnx.extract_frame_info()
-    all_frames = normal_frames
-    if add_t_pose:
-        tpose_frame = [f for f in config_frames if f["type"] == "tpose"][0]
-        all_frames.insert(0, tpose_frame)
+    # normal frames come as (num_frames, dim) arrays: prepend config frames
+    pose_frames = []
     if add_identity_pose:
         id_frame = [f for f in config_frames if f["type"] == "identity"][0]
-        all_frames.insert(0, id_frame)
+        pose_frames.append(id_frame)
+    if add_t_pose:
+        tpose_frame = [f for f in config_frames if f["type"] == "tpose"][0]
+        pose_frames.append(tpose_frame)
+    all_positions = np.vstack([f["position"] for f in pose_frames] +
+                              [normal_frames["position"]])
+    all_orientations = np.vstack([f["orientation"] for f in pose_frames] +
+                                 [normal_frames["orientation"]])
+    # one row per segment: (num_frames, num_segments, 3 or 4). Reshaping the
+    # contiguous arrays doesn't copy, and replaces the per-frame slicing
+    num_segments = frames_metadata["segmentCount"]
+    num_frames = len(all_positions)
+    all_positions = all_positions.reshape(num_frames, num_segments, 3)
+    all_orientations = all_orientations.reshape(num_frames, num_segments, 4)
     #
-    segments = sorted(mvnx.mvnx.subject.segments.iterchildren(),
-                      key=lambda elt: int(elt.attrib["id"]))
-    seg2idx = {s.attrib["label"]: i for i, s in enumerate(segments)}
-    segment_points = {s: {p.attrib["label"]: Vector(str_to_vec(p.pos_b.text))
-                          for p in segments[i].points.iterchildren()}
-                      for s, i in seg2idx.items()}
-
+    # segment names come in id order, which is also the order of the frames
+    seg_names = mvnx.extract_segments()
+    seg2idx = {s: i for i, s in enumerate(seg_names)}
     _, joints = mvnx.extract_joints()
+    # only the joint connectors and root/leaf points are needed
+    segment_points = mvnx.extract_segment_points(
+        {p for conn in joints for _, p in conn}.union(ROOT_POINTS,
+                                                      LEAF_POINTS))
     joints_lite = [(ori, dest) for ((ori, _), (dest, _)) in joints]
     #
-    num_segments = frames_metadata["segmentCount"]
-    num_frames = len(all_frames)
-    frame_rate = int(mvnx.mvnx.subject.attrib["frameRate"])
+    frame_rate = int(mvnx.mvnx.element.find(SUBJECT_PATH).get("frameRate"))
     #
-    assert len(segments) == num_segments, "Inconsistent segmentCount?"
+    assert len(seg_names) == num_segments, "Inconsistent segmentCount?"
 
     # create armature and prepare to fill it
     if verbose:
         print("Creating and filling Blender armature...")
-    bpy.ops.object.select_all(action='DESELECT')
+    # context.mode follows the active object, so it is read before the new
+    # armature (always in OBJECT mode) becomes active
+    prev_mode = context.mode
+    # deselect through the data API, instead of the select_all operator
+    for ob in context.selected_objects:
+        ob.select_set(False)
     arm_data = bpy.data.armatures.new(mvnx_filename)
     arm_ob = bpy.data.objects.new(mvnx_filename, arm_data)
-    arm_name = arm_ob.name
     context.collection.objects.link(arm_ob)
     arm_ob.select_set(True)
     context.view_layer.objects.active = arm_ob
-    bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
+    # operators are expensive: only leave the current mode if needed
+    if prev_mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT', toggle=False)
     bpy.ops.object.mode_set(mode='EDIT', toggle=False)
 
-    # create one bone per segment
-    edit_bones = [arm_data.edit_bones.new(s.attrib["label"])
-                  for s in segments]
-
-    # create forest of bones using joints info: note that at this point the
-    # 'connectivity' variable is ignored, since the MVNX defines heads and
+    # compute the forest of bones using joints info: note that at this point
+    # the 'connectivity' variable is ignored, since the MVNX defines heads and
     # tails assuming connected segments.
-    for parent_n, child_n in joints_lite:  # conn1, conn2 in joints:
-        # set parenthood
-        edit_bones[seg2idx[child_n]].parent = edit_bones[seg2idx[parent_n]]
-    # set heads and tails, as well as other edit bone properties:
-    for b in edit_bones:
-        set_bone_head_and_tail(b, segment_points, joints, scale=scale)
+    parent_idxs, heads, tails, connected = compute_heads_and_tails(
+        seg_names, segment_points, joints, scale=scale)
+
+    # create one bone per segment with its head and tail. Parenthood is set
+    # afterwards, since connecting a bone snaps it to its parent's tail
+    edit_bones = [arm_data.edit_bones.new(s) for s in seg_names]
+    for b, head, tail in zip(edit_bones, heads, tails):
+        b.head = head
+        b.tail = tail
         b.use_inherit_rotation = inherit_rotations
+    for b, p, conn in zip(edit_bones, parent_idxs, connected):
+        if p >= 0:
+            b.parent = edit_bones[p]
+            b.use_connect = bool(conn)
 
     # Once heads and tails are set, and before EDIT mode is exited,
     # remove parenthood if required by the connectivity
@@ -259,120 +327,99 @@ def load_mvnx_into_blender(
     arm_ob.animation_data_create()
     action = bpy.data.actions.new(name=mvnx_filename)
     arm_ob.animation_data.action = action
-    pose_bones = [arm_ob.pose.bones[s.attrib["label"]] for s in segments]
+    # snapshot the pose bones once, in segment order
+    pb_by_name = {pb.name: pb for pb in arm_ob.pose.bones}
+    pose_bones = [pb_by_name[s] for s in seg_names]
     pb_roots = {b for b in pose_bones if b.parent is None}
 
-    # one we switched out of EDIT mode, bones with coordinates can be retrieved
-    def get_edit_bone(eb_name):
-        """
-        Returns an EditBone by name in a way that matrix_local can be accessed.
-        """
-        return bpy.data.objects[arm_name].data.bones[eb_name]
-
-    def get_pose_bone(pb_name):
-        """
-        Returns a PoseBone by name in a way that matrix_basis and rotation
-        data can be accessed.
-        """
-        return bpy.data.objects[arm_name].pose.bones[pb_name]
-
-    # these matrices convert from the global coordinates to bone in rest pos.
-    eb_matrices = {b.name: get_edit_bone(b.name).matrix_local.copy()
-                   for b in pose_bones}
-    # the inverses convert from rest bone coords to global (inverted_safe?)
-    eb_matrices_inv = {k: v.inverted() for k, v in eb_matrices.items()}
+    # one we switched out of EDIT mode, bones with coordinates can be
+    # retrieved. These matrices convert from the global coordinates to bone
+    # in rest pos. They are gathered once, together with their rotations as
+    # quaternions
+    rest_matrices = [arm_data.bones[s].matrix_local for s in seg_names]
+    rest_quats = np.array([m.to_quaternion() for m in rest_matrices])
+    rest_matrices = np.array(rest_matrices)  # (num_segments, 4, 4)
+
+    # Note that if connectivity=="INDIVIDUAL", all bones are roots and have
+    # a location channel. Only the roots have location curves
+    loc_idxs = [i for i, pb in enumerate(pose_bones) if pb in pb_roots]
+
+    # at this point we have everything set up and can start computing the
+    # frames. Note that the global quaternion rotations given by the MVNX
+    # have to be inherited only if connectivity=="CONNECTED" and
+    # inherit_rotations is true. All frames are converted at once, as
+    # (num_frames, num_segments, dim) arrays.
+    if verbose:
+        print("   computing bone transforms...")
+    glob_ori = all_orientations.astype(np.float64)
+    if (connectivity == "CONNECTED") and inherit_rotations:
+        glob_ori = global_to_inherited_quats(glob_ori, joints_lite, seg2idx)
 
     # MVNX gives positions and orientations with respect to a earth-based frame
     # where (x, y, z) == (north, west, up).
     # We assume that Blender's right-hand coord system also has that exact
     # meaning, but the PoseBone rotations have to be given WITH RESPECT TO
     # THE BONE (this is so independently whether rotations are inherited).
-    # Therefore, these two closures handle the conversion of location and
-    # orientation information from MVNX to Blender formats.
-    def global_loc_to_bone(g_loc, bone_name):
-        """
-        :param Vector g_loc: (x, y, z) global position vector
-        :returns: same vector expressed in terms of the bone basis. If the
-          output is applied to the bone, it will appear in the global g_loc.
-        """
-        bone_transl_mat = Matrix.Translation(g_loc)
-        b_loc = (eb_matrices_inv[bone_name] @ bone_transl_mat).to_translation()
-        return b_loc
-
-    def global_quat_to_bone(g_quat, bone_name):
-        """
-        :param Quaternion g_quat: The quaternion orientation of a bone with
-          respect to a global frame
-
-        This function receives the orientation of the bone with respect to a
-        global frame, and computes the same orientation WITH RESPECT TO THE
-        REST POSE OF THE BONE. I.e.::
-          R = q_rest_to_g * g_quat * q_g_to_rest
-
-        This makes sense, since rotating global->rest and then applying R
-        is the same as rotating rest->global, applying g_quat and then rotating
-        global->rest.
-        """
-        eb_quat = eb_matrices[bone_name].to_quaternion()
-        return eb_quat.conjugated().cross(g_quat).cross(eb_quat)
-
-    # create one FCurve per data channel and fill them with empty <num_frames>.
-    # Note that if connectivity=="INDIVIDUAL", all bones are roots and have
-    # a location channel
-    fcurves = {pb.name: {"loc": [], "ori": []} for pb in pose_bones}
-
-    for pb in pose_bones:
-        has_location = pb in pb_roots
-        #
-        if has_location:
-            loc_dp = 'pose.bones["%s"].location' % pb.name  # datapath
-            for dim_loc in range(3):
-                fcurve = action.fcurves.new(data_path=loc_dp, index=dim_loc)
-                fcurves[pb.name]["loc"].append(fcurve)
+    # Therefore, the orientation of each bone with respect to the global
+    # frame is converted to the orientation WITH RESPECT TO THE REST POSE OF
+    # THE BONE. I.e.::
+    #   R = q_rest_to_g * g_quat * q_g_to_rest
+    # This makes sense, since rotating global->rest and then applying R
+    # is the same as rotating rest->global, applying g_quat and then rotating
+    # global->rest.
+    # Since R is linear in g_quat, each bone gets a 4x4 matrix (its rows
+    # are R applied to the basis quaternions), and all frames are converted
+    # with a single batched matmul, without intermediate quaternion arrays
+    rest_quats = rest_quats[:, np.newaxis]  # (num_segments, 1, 4)
+    rest_sandwich = quat_mul(quat_mul(quat_conjugate(rest_quats), np.eye(4)),
+                             rest_quats)  # (num_segments, basis, 4)
+    # The results are stored channel-major, as (num_segments, dim, num_frames)
+    # arrays, so the values of each FCurve are contiguous
+    ori_values = np.matmul(rest_sandwich.transpose(0, 2, 1),
+                           glob_ori.transpose(1, 2, 0))
+    # Locations (only for bones with location curves) are converted with the
+    # inverse of the rest matrix, which maps global coords to the bone basis:
+    # if the output is applied to the bone, it will appear in the global pos.
+    # This happens always, independently of rotation inheritance. One row per
+    # entry in loc_idxs: (num_loc_bones, 3, num_frames)
+    rest_inv = np.linalg.inv(rest_matrices[loc_idxs])
+    loc_values = np.einsum(
+        "bij,fbj->bif", rest_inv[:, :3, :3],
+        all_positions[:, loc_idxs] * scale) + rest_inv[:, :3, 3:]
+
+    # create one FCurve per data channel and fill it in a single pass:
+    # foreach_set takes a flat (time, value, time, ...) buffer, and writes
+    # all keyframes of a curve at once, in C. Enums are also set in bulk
+    # through their value, looked up in the RNA definition
+    if verbose:
+        print("   writing keyframes...")
+    co = np.empty(2 * num_frames, dtype=np.float32)
+    co[0::2] = np.arange(num_frames) + frame_start
+    interp_items = bpy.types.Keyframe.bl_rna.properties[
+        "interpolation"].enum_items
+    constant_interp = np.full(num_frames, interp_items["CONSTANT"].value,
+                              dtype=np.int32)
+    loc_rows = dict(zip(loc_idxs, loc_values))
+    for seg_i, pb in enumerate(pose_bones):
+        pb.rotation_mode = "QUATERNION"
+        channels = []  # (datapath, (dim, num_frames) values)
+        if seg_i in loc_rows:
+            channels.append(('pose.bones["%s"].location' % pb.name,
+                             loc_rows[seg_i]))
+        channels.append(('pose.bones["%s"].rotation_quaternion' % pb.name,
+                         ori_values[seg_i]))
+        for datapath, bone_values in channels:
+            for dim, channel_values in enumerate(bone_values):
+                fcurve = action.fcurves.new(data_path=datapath, index=dim)
                 kf_points = fcurve.keyframe_points
                 kf_points.add(num_frames)
-        # fill rotation fcurves
-        pb.rotation_mode = "QUATERNION"
-        rot_dp = 'pose.bones["%s"].rotation_quaternion' % pb.name
-        for dim_rot in range(4):
-            fcurve = action.fcurves.new(data_path=rot_dp, index=dim_rot)
-            fcurves[pb.name]["ori"].append(fcurve)
-            kf_points = fcurve.keyframe_points
-            kf_points.add(num_frames)
-
-    # at this point we have everything set up and can start filling up the
-    # frames. Note that the global quaternion rotations given by the MVNX
-    # have to be inherited only if connectivity=="CONNECTED" and
-    # inherit_rotations is true.
-    for frame_i, frame in enumerate(all_frames):
-        if verbose and (frame_i % 1000 == 0):
-                print("   loaded frame %d/%d" % (frame_i, num_frames))
-        frame_time = frame_i + frame_start
-        frame_pos = [Vector(frame["position"][i: i+3])
-                     for i in range(0, 3 * num_segments, 3)]
-        frame_ori = [Quaternion(frame["orientation"][i:i+4])
-                     for i in range(0, 4*num_segments, 4)]
-
-        if (connectivity == "CONNECTED") and inherit_rotations:
-            frame_ori = global_to_inherited_quats(frame_ori, joints_lite,
-                                                  seg2idx)
-        for pb, glob_loc, glob_ori in zip(pose_bones, frame_pos, frame_ori):
-            b_name = pb.name
-            # fill location curves
-            loc_fcurves = fcurves[b_name]["loc"]
-            if loc_fcurves:
-                # this happens always, independently of rotation inheritance
-                bone_loc = global_loc_to_bone(glob_loc * scale, b_name)
-                for loc_fc, loc_entry in zip(loc_fcurves, bone_loc):
-                    loc_fc.keyframe_points[frame_i].co.x = frame_time
-                    loc_fc.keyframe_points[frame_i].co.y = loc_entry
-            # fill orientation curves
-            ori_fcurves = fcurves[b_name]["ori"]
-            if ori_fcurves:
-                bone_ori = global_quat_to_bone(glob_ori, b_name)
-                for ori_fc, ori_entry in zip(ori_fcurves, bone_ori):
-                    ori_fc.keyframe_points[frame_i].co.x = frame_time
-                    ori_fc.keyframe_points[frame_i].co.y = ori_entry
+                co[1::2] = channel_values
+                kf_points.foreach_set("co", co)
+                # if IMPORT_LOOP:
+                #     pass  # 2.5 doenst have cyclic now?
+                kf_points.foreach_set("interpolation", constant_interp)
+                # bulk writes skip the per-keyframe updates: refresh once
+                fcurve.update()
 
     # Done with animation importing. Final global configs:
 
@@ -381,17 +428,13 @@ def load_mvnx_into_blender(
     context.scene.render.fps = frame_rate
     context.scene.frame_start = int(frame_start)
     context.scene.frame_end = context.scene.frame_start + num_frames + 1
-    context.scene.frame_set(context.scene.frame_start)
-    # finally config curves, apply matrix and return armature
-    for c in action.fcurves:
-        # if IMPORT_LOOP:
-        #     pass  # 2.5 doenst have cyclic now?
-        for ckfp in c.keyframe_points:
-            ckfp.interpolation = "CONSTANT"  # "LINEAR" "CUBIC" "BEZIER"
+    # finally apply matrix and return armature
     # arm_ob.matrix_world = global_matrix
     # bpy.ops.object.transform_apply(location=False,rotation=True,scale=False)
 
-    context.view_layer.update()
+    # setting the frame evaluates the scene once the curves are complete, so
+    # no separate view layer update is needed
+    context.scene.frame_set(context.scene.frame_start)
     report({'INFO'}, "Loaded %s (%d frames)" % (mvnx_filename, num_frames))
     if verbose:
         print("Loaded %s (%d frames)" % (mvnx_filename, num_frames))
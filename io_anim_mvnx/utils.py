@@ -15,6 +15,7 @@ import sys
 import datetime
 import pytz
 from math import radians  # degrees
+import numpy as np
 # mathutils is a blender package
 from mathutils import Euler  # , Vector
 from bpy.types import PropertyGroup
@@ -252,10 +253,37 @@ def rot_euler_degrees(rot_x, rot_y, rot_z, order="XYZ"):
 
 def str_to_vec(s):
     """
-    Converts a string like '1.23, 2.34 ...' into a list
-    like [1.23, 2.34, ...]
+    Converts a string like '1.23 2.34 ...' into a float64 array
+    like [1.23, 2.34, ...]. NumPy parses the whole string in C, instead of
+    calling ``float`` once per number. Mathutils types like ``Vector`` accept
+    the result as it is.
     """
-    return [float(x) for x in s.split(" ")]
+    return np.fromstring(s, sep=" ", dtype=np.float64)
+
+
+def quat_conjugate(q):
+    """
+    :param q: Array of shape ``(..., 4)`` with quaternions in ``wxyz`` order.
+    :returns: The conjugated quaternions, same shape as ``q``.
+    """
+    result = q.copy()
+    result[..., 1:] *= -1
+    return result
+
+
+def quat_mul(q1, q2):
+    """
+    :param q1: Array of shape ``(..., 4)`` with quaternions in ``wxyz`` order.
+    :param q2: Array of shape broadcastable with ``q1``.
+    :returns: The Hamilton products ``q1 * q2`` as a ``(..., 4)`` array, i.e.
+      the batched equivalent of ``Quaternion(q1).cross(Quaternion(q2))``.
+    """
+    w1, x1, y1, z1 = np.moveaxis(q1, -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(q2, -1, 0)
+    return np.stack([w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+                     w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                     w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+                     w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2], axis=-1)
 
 
 def is_number(s):
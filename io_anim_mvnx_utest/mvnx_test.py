@@ -16,9 +16,15 @@ import unittest
 # import io_anim_mvnx
 # from io_anim_mvnx.utils import ArgumentParserForBlender
 
-from os.path import join, dirname
+import os
+import shutil
+import tempfile
+from os.path import join, dirname, isfile
+import numpy as np
+from lxml import etree
 from io_anim_mvnx.utils import resolve_path
-from io_anim_mvnx.mvnx import Mvnx
+from io_anim_mvnx import mvnx as mvnx_module
+from io_anim_mvnx.mvnx import Mvnx, process_dict, frame_vec_widths
 
 
 class MvnxTest(unittest.TestCase):
@@ -35,3 +41,298 @@ class MvnxTest(unittest.TestCase):
         MVNX_SCHEMA = join(self.DATAPATH, "mvnx_schema_mpiea.xsd")
         MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
         Mvnx(MVNX, MVNX_SCHEMA)
+
+    def test_mvnx_invalid_schema(self):
+        """
+        The test file uses ``pos_b`` points, which the original schema doesn't
+        allow.
+        """
+        MVNX_SCHEMA = join(self.DATAPATH, "mvnx_schema_original.xsd")
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        self.assertRaises(etree.DocumentInvalid, Mvnx, MVNX, MVNX_SCHEMA)
+
+    def test_extract_segments_cached(self):
+        """
+        Segments, points and joints are extracted once, and each call
+        returns its own copy.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        mvnx = Mvnx(MVNX)
+        segments = mvnx.extract_segments()
+        points = mvnx.extract_segment_points()
+        names, connectors = mvnx.extract_joints()
+        self.assertEqual(list(points), segments)
+        pos_b = mvnx.mvnx.subject.segments.segment.points.point.pos_b.text
+        self.assertEqual(points["Pelvis"]["pHipOrigin"].tolist(),
+                         [float(x) for x in pos_b.split()])
+        segments.clear()
+        points["Pelvis"]["pHipOrigin"][:] = 123
+        points["Pelvis"].clear()
+        names.clear()
+        self.assertEqual(len(mvnx.extract_segments()), 23)
+        self.assertNotEqual(
+            mvnx.extract_segment_points()["Pelvis"]["pHipOrigin"][0], 123)
+        # filtering by label keeps all segments, and returns the same values
+        some_points = Mvnx(MVNX).extract_segment_points({"pHipOrigin"})
+        self.assertEqual(list(some_points), mvnx.extract_segments())
+        self.assertEqual(list(some_points["Pelvis"]), ["pHipOrigin"])
+        self.assertEqual(some_points["Pelvis"]["pHipOrigin"].tolist(),
+                         [float(x) for x in pos_b.split()])
+        self.assertEqual(some_points["Head"], {})
+        self.assertEqual(len(mvnx.extract_joints()[0]), len(connectors))
+
+    def test_schema_reused(self):
+        """
+        The compiled schema is shared across instances, and still validates
+        every file it is used for.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        for name, valid in (("mvnx_schema_mpiea.xsd", True),
+                            ("mvnx_schema_original.xsd", False)):
+            MVNX_SCHEMA = join(self.DATAPATH, name)
+            for _ in range(2):
+                if valid:
+                    m = Mvnx(MVNX, MVNX_SCHEMA)
+                    self.assertIs(m.schema, Mvnx(MVNX, MVNX_SCHEMA).schema)
+                else:
+                    self.assertRaises(etree.DocumentInvalid,
+                                      Mvnx, MVNX, MVNX_SCHEMA)
+
+    def test_streaming_matches_extract(self):
+        """
+        The streamed frames hold the same data as the ones extracted from the
+        full tree.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        _, config_frames, normal_frames = Mvnx(MVNX).extract_frame_info()
+        streamed = list(Mvnx.extract_frames_streaming(MVNX))
+        self.assertEqual(len(streamed),
+                         len(config_frames) + len(normal_frames["time"]))
+        for f, cf in zip(streamed, config_frames):
+            self.assertEqual(f["type"], cf["type"])
+            self.assertTrue(np.array_equal(f["orientation"],
+                                           cf["orientation"]))
+        for i, f in enumerate(streamed[len(config_frames):]):
+            self.assertEqual(f["time"], normal_frames["time"][i])
+            self.assertTrue(np.array_equal(f["position"],
+                                           normal_frames["position"][i]))
+
+    def test_process_dict_matrices(self):
+        """
+        Float vector fields are parsed into flat vectors, or into matrices
+        if their number of columns is given.
+        """
+        node = etree.fromstring("<orientation>1 0 0 0 0 1 0 0</orientation>")
+        d = {"orientation": node, "index": "3"}
+        flat = process_dict(d, set(), {"index"}, {"orientation"})
+        mat = process_dict(d, set(), {"index"}, {"orientation"},
+                           {"orientation": 4})
+        self.assertEqual(flat["index"], 3)
+        self.assertEqual(flat["orientation"].shape, (8,))
+        self.assertEqual(mat["orientation"].shape, (2, 4))
+        self.assertTrue(np.array_equal(mat["orientation"].ravel(),
+                                       flat["orientation"]))
+
+    def test_normal_frames_layout(self):
+        """
+        Normal frames are returned as contiguous columns with one row per
+        frame, and the widths given by the metadata.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        meta, _, normal_frames = Mvnx(MVNX).extract_frame_info()
+        num_frames = len(normal_frames["index"])
+        for k, w in frame_vec_widths(meta).items():
+            col = normal_frames[k]
+            self.assertEqual(col.shape, (num_frames, w))
+            self.assertEqual(col.dtype, np.float32)
+            self.assertTrue(col.flags["C_CONTIGUOUS"])
+        self.assertEqual(normal_frames["time"].shape, (num_frames,))
+
+    def test_frames_ndarray(self):
+        """
+        Numeric columns are returned without copies, and can be flattened
+        without copies too.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        mvnx = Mvnx(MVNX)
+        ori = mvnx.frames_ndarray("orientation")
+        self.assertIs(ori, mvnx.frames_ndarray("orientation"))
+        self.assertTrue(np.shares_memory(ori, ori.ravel()))
+        self.assertEqual(mvnx.times_ndarray().shape, (len(ori),))
+        self.assertRaises(AssertionError, mvnx.frames_ndarray, "tc")
+
+    def test_float_dtype(self):
+        """
+        Float vectors can be parsed as float64, in both parsing modes.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        _, _, normal32 = Mvnx(MVNX).extract_frame_info()
+        for keep_frames in (True, False):
+            mvnx = Mvnx(MVNX, keep_frames=keep_frames, float_dtype=np.float64)
+            _, config_frames, normal64 = mvnx.extract_frame_info()
+            self.assertEqual(config_frames[0]["position"].dtype, np.float64)
+            self.assertEqual(normal64["position"].dtype, np.float64)
+            self.assertTrue(np.allclose(normal64["position"],
+                                        normal32["position"], atol=1e-6))
+
+    def test_needed_fields(self):
+        """
+        Float vector fields that aren't needed are left unparsed.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        _, _, normal_frames = Mvnx(MVNX).extract_frame_info()
+        for keep_frames in (True, False):
+            mvnx = Mvnx(MVNX, keep_frames=keep_frames,
+                        needed_fields={"position"})
+            _, _, normal_frames2 = mvnx.extract_frame_info()
+            self.assertTrue(np.array_equal(normal_frames["position"],
+                                           normal_frames2["position"]))
+            self.assertIsInstance(normal_frames2["orientation"], list)
+            # XML nodes if the frames are kept, their text otherwise
+            text = normal_frames2["orientation"][0]
+            if keep_frames:
+                text = text.text
+            self.assertTrue(np.array_equal(
+                np.fromstring(text, sep=" ", dtype=np.float32),
+                normal_frames["orientation"][0]))
+
+    def test_streamed_frames_hold_no_nodes(self):
+        """
+        Frames converted while parsing don't reference the XML tree, even
+        for fields that aren't converted, so the cleared frames can be freed.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        mvnx = Mvnx(MVNX, keep_frames=False,
+                    needed_fields={"orientation", "position"})
+        config_frames, normal_frames = mvnx._frames_raw
+        self.assertEqual(len(config_frames), 3)
+        for frame in config_frames:
+            for v in frame.values():
+                self.assertNotIsInstance(v, etree._Element)
+        for col in normal_frames.values():
+            if isinstance(col, list):
+                for v in col:
+                    self.assertNotIsInstance(v, etree._Element)
+
+    def test_parse_without_frames(self):
+        """
+        Converting the frames while parsing gives the same results as
+        extracting them from the full tree, and drops them from the tree.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        meta, config_frames, normal_frames = Mvnx(MVNX).extract_frame_info()
+        mvnx = Mvnx(MVNX, keep_frames=False)
+        meta2, config_frames2, normal_frames2 = mvnx.extract_frame_info()
+        self.assertEqual(len(mvnx.mvnx.subject.frames.getchildren()), 0)
+        self.assertEqual(meta, meta2)
+        self.assertEqual([f["type"] for f in config_frames],
+                         [f["type"] for f in config_frames2])
+        self.assertEqual(set(normal_frames), set(normal_frames2))
+        for k in ("orientation", "position", "time"):
+            self.assertTrue(np.array_equal(normal_frames[k],
+                                           normal_frames2[k]))
+
+    def test_parse_without_frames_parallel(self):
+        """
+        Parsing the frames in worker processes gives the same results as
+        parsing them in the calling process.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        mvnx = Mvnx(MVNX, keep_frames=False)
+        _, _, normal_frames = mvnx.extract_frame_info()
+        old = mvnx_module.PARALLEL_MIN_FRAMES, mvnx_module.FRAME_BATCH_SIZE
+        try:
+            mvnx_module.PARALLEL_MIN_FRAMES = 10
+            mvnx_module.FRAME_BATCH_SIZE = 16
+            mvnx = Mvnx(MVNX, keep_frames=False, num_workers=2)
+            _, _, normal_frames2 = mvnx.extract_frame_info()
+        finally:
+            mvnx_module.PARALLEL_MIN_FRAMES, mvnx_module.FRAME_BATCH_SIZE = old
+        self.assertEqual(set(normal_frames), set(normal_frames2))
+        for k in ("orientation", "position", "index", "time"):
+            self.assertTrue(np.array_equal(normal_frames[k],
+                                           normal_frames2[k]))
+
+    def test_truncated_frame(self):
+        """
+        A frame with a missing number raises a ``ValueError`` instead of
+        yielding a corrupted array, with or without keeping the frames.
+        """
+        with open(join(self.TEST_DATAPATH, "test_mocap.mvnx")) as f:
+            text = f.read()
+        # drop the last number of the last frame's position
+        start = text.rindex("<position>") + len("<position>")
+        end = text.index("</position>", start)
+        text = text[:start] + text[start:end].rsplit(" ", 1)[0] + text[end:]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            MVNX = join(tmpdir, "truncated.mvnx")
+            with open(MVNX, "w") as f:
+                f.write(text)
+            with self.assertRaises(ValueError) as cm:
+                Mvnx(MVNX).extract_frame_info()
+            self.assertIn("position", str(cm.exception))
+            with self.assertRaises(ValueError) as cm:
+                Mvnx(MVNX, keep_frames=False)
+            self.assertIn("position", str(cm.exception))
+
+    def test_export_roundtrip(self):
+        """
+        Blank text is dropped when parsing, but the export is indented again
+        and loads into the same data.
+        """
+        MVNX = join(self.TEST_DATAPATH, "test_mocap.mvnx")
+        mvnx = Mvnx(MVNX)
+        self.assertIsNone(mvnx.mvnx.element[0].tail)
+        _, _, normal_frames = mvnx.extract_frame_info()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            out_path = join(tmpdir, "exported.mvnx")
+            mvnx.export(out_path, timestamp="now")
+            with open(out_path) as f:
+                self.assertIn("\n  <", f.read())
+            mvnx2 = Mvnx(out_path)
+            _, _, normal_frames2 = mvnx2.extract_frame_info()
+        # MVNX <comment> nodes are elements, not XML comments: they stay
+        self.assertEqual(mvnx2.mvnx.comment.tag, mvnx.mvnx.comment.tag)
+        self.assertEqual(len(mvnx2.mvnx.subject.comment), 0)
+        for k in ("orientation", "position", "time"):
+            self.assertTrue(np.array_equal(normal_frames[k],
+                                           normal_frames2[k]))
+
+    def test_frame_cache(self):
+        """
+        The first cached extraction writes the sidecar file, and the second one
+        reads the same float data back from it.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            MVNX = join(tmpdir, "test_mocap.mvnx")
+            shutil.copy(join(self.TEST_DATAPATH, "test_mocap.mvnx"), MVNX)
+            mvnx = Mvnx(MVNX)
+            _, _, parsed = mvnx.extract_frame_info(use_cache=True)
+            self.assertTrue(isfile(MVNX + Mvnx.CACHE_SUFFIX))
+            _, _, cached = mvnx.extract_frame_info(use_cache=True)
+            self.assertEqual(set(parsed), set(cached))
+            for k in mvnx.fvec_fields.intersection(parsed):
+                self.assertTrue(np.array_equal(parsed[k], cached[k]))
+            # skipped fields aren't built at all, not even as placeholders
+            frames = mvnx_module.XPATH_FRAMES(mvnx.mvnx.element)[3:]
+            cols = mvnx_module.frames_to_columns(
+                frames, mvnx.str_fields, mvnx.int_fields, {"orientation"},
+                skip_fields={"position"})
+            self.assertNotIn("position", cols)
+            self.assertTrue(np.array_equal(cols["orientation"],
+                                           parsed["orientation"]))
+
+    def test_frame_cache_unwritable(self):
+        """
+        If the sidecar file can't be written, the frames are still returned
+        and no temporary file is left behind.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            MVNX = join(tmpdir, "test_mocap.mvnx")
+            shutil.copy(join(self.TEST_DATAPATH, "test_mocap.mvnx"), MVNX)
+            # a directory in the way of the cache file makes the write fail
+            os.mkdir(MVNX + Mvnx.CACHE_SUFFIX)
+            mvnx = Mvnx(MVNX)
+            _, _, parsed = mvnx.extract_frame_info(use_cache=True)
+            self.assertIn("position", parsed)
+            self.assertFalse(isfile(MVNX + Mvnx.CACHE_SUFFIX + ".tmp"))
@@ -13,7 +13,9 @@ import sys
 import unittest
 # mock sys.argv with "patch": https://stackoverflow.com/a/27765993
 from unittest.mock import patch
-from io_anim_mvnx.utils import ArgumentParserForBlender
+import numpy as np
+from io_anim_mvnx.utils import ArgumentParserForBlender, quat_conjugate, \
+    quat_mul, str_to_vec
 
 
 class ArgparserTest(unittest.TestCase):
@@ -88,3 +90,49 @@ class ArgparserTest(unittest.TestCase):
             apfb.add_argument("-b", type=int)
             arg_dict = vars(apfb.parse_args())
             self.assertEqual(arg_dict, python_args)
+
+
+class StrToVecTest(unittest.TestCase):
+    """
+    Test the parsing of MVNX-like vector strings.
+    """
+
+    def test_parse(self):
+        """
+        Numbers in any float notation are parsed in order, as float64.
+        """
+        vec = str_to_vec("0.5 -2 1e-3 0.000000")
+        self.assertEqual(vec.dtype, np.float64)
+        self.assertEqual(vec.tolist(), [0.5, -2.0, 0.001, 0.0])
+
+
+class QuaternionTest(unittest.TestCase):
+    """
+    Test the batched numpy quaternion helpers.
+    """
+
+    def test_basis_products(self):
+        """
+        Hamilton rules: ij = k, jk = i, ki = j, and ji = -k.
+        """
+        one, i, j, k = np.eye(4)
+        self.assertTrue(np.array_equal(quat_mul(i, j), k))
+        self.assertTrue(np.array_equal(quat_mul(j, k), i))
+        self.assertTrue(np.array_equal(quat_mul(k, i), j))
+        self.assertTrue(np.array_equal(quat_mul(j, i), -k))
+        self.assertTrue(np.array_equal(quat_mul(one, k), k))
+
+    def test_batched_conjugate(self):
+        """
+        Multiplying unit quaternions by their conjugates yields the identity,
+        also when broadcasting a batch against a single quaternion.
+        """
+        q = np.random.RandomState(0).randn(5, 3, 4)
+        q /= np.linalg.norm(q, axis=-1, keepdims=True)
+        ident = np.zeros_like(q)
+        ident[..., 0] = 1
+        self.assertTrue(np.allclose(quat_mul(q, quat_conjugate(q)), ident))
+        #
+        prod = quat_mul(q, q[0, 0])
+        self.assertEqual(prod.shape, q.shape)
+        self.assertTrue(np.allclose(prod[2, 1], quat_mul(q[2, 1], q[0, 0])))